@@ -14,130 +14,236 @@ This code is licensed under GNU Affero General Public License v3 (AGPLv3) with a
 Full AGPLv3 text available in LICENSE file or at <https://www.gnu.org/licenses/agpl-3.0.html>
 """
 
+import inspect
 import random
 
+import numpy as np
+from numba import njit
+from scipy.sparse import csr_matrix, identity
+from scipy.sparse.linalg import gmres, spsolve
+
+# SciPy renamed gmres's relative tolerance from `tol` to `rtol` (1.12) and removed `tol` in 1.14,
+# so the keyword is chosen from the installed signature.
+_GMRES_RTOL = 'rtol' if 'rtol' in inspect.signature(gmres).parameters else 'tol'
+
+
+def build_transition_tables(env):
+    """Precomputes the deterministic dynamics of the environment as dense lookup tables.
+    :param env: An instance of the environment, providing states, actions, and transition dynamics.
+    :return: A tuple (states, state_to_idx, NS, R) where states is the ordered list of states,
+             state_to_idx maps each state to its row index, NS[s, a] is the index of the next state
+             and R[s, a] is the immediate reward for taking action a in state s.
+    """
+    states = list(env.states)
+    state_to_idx = {state: i for i, state in enumerate(states)}
+    n_states, n_actions = len(states), len(env.action_keys)
+
+    NS = np.empty((n_states, n_actions), dtype=np.int32)
+    R = np.empty((n_states, n_actions), dtype=np.float64)
+    # Query the environment exactly once per state-action pair.
+    for i, s in enumerate(states):
+        for k, action in enumerate(env.action_keys):
+            next_s, reward, _ = env.step(s, action)
+            NS[i, k] = state_to_idx[next_s]
+            R[i, k] = reward
+
+    # The terminal state is absorbing with zero reward, so its value stays fixed at 0.
+    goal_idx = state_to_idx[env.goal_pos]
+    NS[goal_idx, :] = goal_idx
+    R[goal_idx, :] = 0.0
+
+    return states, state_to_idx, NS, R
+
+
+@njit(cache=True)
+def _bellman_sweep(V, NS, R, gamma):
+    """Performs one synchronous Bellman optimality backup over all states.
+    :param V: The current value function as an array indexed by state.
+    :param NS: The next-state index table of shape (n_states, n_actions).
+    :param R: The reward table of shape (n_states, n_actions).
+    :param gamma: The discount factor for future rewards (float).
+    :return: A tuple (V_new, policy) with the backed-up values and the greedy action index per state.
+    """
+    n_states, n_actions = NS.shape
+    V_new = np.empty(n_states)
+    policy = np.empty(n_states, np.int32)
+    for s in range(n_states):
+        # Ties are resolved towards the first action, matching argmax.
+        best_value = -np.inf
+        best_action = 0
+        for a in range(n_actions):
+            q_value = R[s, a] + gamma * V[NS[s, a]]
+            if q_value > best_value:
+                best_value = q_value
+                best_action = a
+        V_new[s] = best_value
+        policy[s] = best_action
+    return V_new, policy
+
+
+@njit(cache=True)
+def _bellman_sweep_inplace(V, NS, R, gamma, order):
+    """Performs one Gauss-Seidel Bellman optimality backup, updating the value function in place.
+    :param V: The value function as an array indexed by state; overwritten with the backed-up values.
+    :param NS: The next-state index table of shape (n_states, n_actions).
+    :param R: The reward table of shape (n_states, n_actions).
+    :param gamma: The discount factor for future rewards (float).
+    :param order: The order in which the states are backed up.
+    :return: The largest absolute change of any state's value during the sweep.
+    """
+    n_actions = NS.shape[1]
+    delta = 0.0
+    for s in order:
+        # Successors already visited in this sweep contribute their freshly updated values.
+        best_value = -np.inf
+        for a in range(n_actions):
+            q_value = R[s, a] + gamma * V[NS[s, a]]
+            if q_value > best_value:
+                best_value = q_value
+        delta = max(delta, abs(best_value - V[s]))
+        V[s] = best_value
+    return delta
+
+
+def goal_distance_order(NS, goal_idx):
+    """Orders the states by their breadth-first distance to the goal.
+    :param NS: The next-state index table of shape (n_states, n_actions).
+    :param goal_idx: The index of the goal state.
+    :return: An array of state indices, nearest to the goal first; states that cannot reach the goal come last.
+    """
+    n_states = NS.shape[0]
+    reached = np.zeros(n_states, dtype=bool)
+    reached[goal_idx] = True
+    frontier = np.array([goal_idx])
+    layers = [frontier]
+
+    # Expand backwards from the goal: a state joins the next layer if some action leads into the current one.
+    while frontier.size > 0:
+        in_frontier = np.zeros(n_states, dtype=bool)
+        in_frontier[frontier] = True
+        frontier = np.flatnonzero(in_frontier[NS].any(axis=1) & ~reached)
+        reached[frontier] = True
+        layers.append(frontier)
+
+    layers.append(np.flatnonzero(~reached))
+    return np.concatenate(layers)
+
 
 def value_iteration(env, gamma=0.9, theta=1e-6):
     """Solves the MDP using the Value Iteration algorithm.
     :param env: An instance of the environment, providing states, actions, and transition dynamics.
     :param gamma: The discount factor for future rewards (float).
     :param theta: A small positive number defining the convergence threshold for the value function.
-    :return: A tuple (v, policy, history) where v is the optimal value function (dict) and policy is the optimal policy (dict), and history is a list of value history.
+    :return: A tuple (v, policy, history) where v is the optimal value function (dict) and policy is the optimal policy (dict), and history is an array of shape (iterations + 1, n_states) of value snapshots whose columns follow env.states.
     """
-    # Initialize the value function and policy arbitrarily.
-    v = {state: 0 for state in env.states}
-    policy = {state: '' for state in env.states}
-    iteration = 0
+    # Build the transition tables once, then every sweep is a pure array operation.
+    states, state_to_idx, NS, R = build_transition_tables(env)
+
+    # Gauss-Seidel ordering: states are backed up in place outwards from the goal, so each state already sees
+    # the values its successors received earlier in the same sweep.
+    goal_idx = state_to_idx[env.goal_pos]
+    order = goal_distance_order(NS, goal_idx)
 
-    # Store the history of the entire value function dictionary
-    history = [v.copy()]
+    # Initialize the value function arbitrarily.
+    V = np.zeros(len(states))
+    iteration = 0
 
+    # Store the history of the entire value function as compact float32 snapshots.
+    history = [V.astype(np.float32)]
 
     # Loop until the value function converges.
     while True:
         iteration += 1
-        # Stores the maximum change in the value function in this iteration.
-        delta = 0
-        # Use a copy for updates within the loop
-        v_old_iter = v.copy()
-        # Iterate over every state in the state space.
-        for s in env.states:
-            # The terminal state has a fixed value of 0 and no actions.
-            if s == env.goal_pos:
-                continue
-            v_old = v_old_iter[s]
-
-            # Calculate the Q-value for each possible action from the current state.
-            action_values = {}
-            for action in env.action_keys:
-                next_s, reward, _ = env.step(s, action)
-                q_value = reward + gamma * v_old_iter[next_s]
-                action_values[action] = q_value
-
-            # Update the policy and value function based on the best action (greedy update).
-            best_action = max(action_values, key=action_values.get)
-            policy[s] = best_action
-            v[s] = action_values[best_action]
-
-            # Check for convergence by tracking the largest change.
-            delta = max(delta, abs(v_old - v[s]))
-
-        # Record the value of the start state after each full sweep.
-        history.append(v.copy())
+        # Greedy in-place update of every state, tracking the largest change.
+        delta = _bellman_sweep_inplace(V, NS, R, gamma, order)
+        # The absorbing goal row is a fixed point of the backup, so no per-state terminal check is needed.
+        assert V[goal_idx] == 0.0
+
+        # Record the value function after each full sweep.
+        history.append(V.astype(np.float32))
 
         # If the largest change is smaller than the threshold, the value function has converged.
         if delta < theta:
             break
 
+    # Extract the greedy policy from the converged values; the terminal state has no action.
+    _, policy_idx = _bellman_sweep(V, NS, R, gamma)
+    policy = {s: env.action_keys[a] for s, a in zip(states, policy_idx)}
+    policy[env.goal_pos] = ''
+    v = dict(zip(states, V.tolist()))
+
     print(f'Converged after {iteration} iterations.')
-    return v, policy, history
+    return v, policy, np.stack(history)
 
 
 def policy_iteration(env, gamma=0.9, theta=1e-6):
     """Solves the MDP using the Policy Iteration algorithm.
     :param env: An instance of the environment.
     :param gamma: The discount factor for future rewards (float).
-    :param theta: A small positive number for the convergence threshold in the policy evaluation step.
-    :return: A tuple (v, policy, history) where v is the optimal value function (dict) and policy is the optimal policy (dict), and history is a list of value history.
+    :param theta: A small positive number for the convergence threshold in the policy evaluation step
+                  (the residual tolerance of the GMRES solve) and the tolerance for treating actions as tied.
+    :return: A tuple (v, policy, history) where v is the optimal value function (dict) and policy is the optimal policy (dict), and history is an array of shape (iterations + 1, n_states) of value snapshots whose columns follow env.states.
     """
-    # Initialize a random policy and a zero value function.
-    policy = {s: random.choice(env.action_keys) for s in env.states if s != env.goal_pos}
-    policy[env.goal_pos] = ''
-    v = {state: 0 for state in env.states}
+    states, state_to_idx, NS, R = build_transition_tables(env)
+    n_states = len(states)
+    goal_idx = state_to_idx[env.goal_pos]
+    rows = np.arange(n_states)
+
+    # Initialize a random policy (as action indices) and a zero value function.
+    policy_idx = np.array([random.randrange(len(env.action_keys)) if s != env.goal_pos else 0 for s in states])
+    V = np.zeros(n_states)
     iteration = 0
 
-    # List to store the value of the start state.
-    history = [v.copy()]
+    # The terminal state is absorbing, so its row of the transition matrix is zeroed to pin v(goal) = 0.
+    transition_weights = np.ones(n_states)
+    transition_weights[goal_idx] = 0.0
+    eye = identity(n_states, format='csr')
+
+    # Store the history of the entire value function as compact float32 snapshots.
+    history = [V.astype(np.float32)]
 
     # Loop until the policy is stable (no longer changes).
     while True:
         iteration += 1
 
         # --- 1. Policy Evaluation ---
-        # Iteratively compute the value function for the current fixed policy.
-        while True:
-            delta = 0
-            for s in env.states:
-                if s == env.goal_pos: continue
-                v_old = v[s]
-                action = policy[s]
-                next_s, reward, _ = env.step(s, action)
-                # Update the value based on the Bellman equation for a fixed policy.
-                v[s] = reward + gamma * v[next_s]
-                delta = max(delta, abs(v_old - v[s]))
-            # Stop evaluation once the value function converges for this policy.
-            if delta < theta:
-                break
+        # Under a fixed deterministic policy the Bellman equation is the linear system (I - gamma * P_pi) v = r_pi,
+        # where P_pi has exactly one nonzero per row. Successive policies give nearby systems, so GMRES warm-started
+        # from the previous value function needs only a few Krylov iterations to reach `theta`.
+        ns_pi = NS[rows, policy_idx]
+        r_pi = R[rows, policy_idx]
+        P_pi = csr_matrix((transition_weights, (rows, ns_pi)), shape=(n_states, n_states))
+        A = eye - gamma * P_pi
+        V, info = gmres(A, r_pi, x0=V, atol=theta, restart=30, **{_GMRES_RTOL: theta})
+        # Fall back to the direct solve if GMRES did not converge.
+        if info != 0:
+            V = spsolve(A, r_pi)
+        assert V[goal_idx] == 0.0
 
         # Record value after full policy evaluation.
-        history.append(v.copy())
+        history.append(V.astype(np.float32))
 
         # --- 2. Policy Improvement ---
-        # Check if the policy can be improved by acting greedily with respect to the new value function.
-        policy_stable = True
-        for s in env.states:
-            if s == env.goal_pos: continue
-            old_action = policy[s]
-
-            # Find the best action according to the updated value function v.
-            action_values = {}
-            for action in env.action_keys:
-                next_s, reward, _ = env.step(s, action)
-                q_value = reward + gamma * v[next_s]
-                action_values[action] = q_value
-            best_action = max(action_values, key=action_values.get)
-            policy[s] = best_action
-
-            # If the best action is different from the old action, the policy is not yet stable.
-            if old_action != best_action:
-                policy_stable = False
+        # Act greedily with respect to the new value function for every state at once.
+        best_q, best_idx = _bellman_sweep(V, NS, R, gamma)
+        # Keep the current action wherever it is within `theta` of the best one, so that the inexact evaluation
+        # cannot make the policy oscillate between tied actions.
+        current_q = r_pi + gamma * V[ns_pi]
+        keep = current_q >= best_q - theta
+        best_idx[keep] = policy_idx[keep]
 
         # If the policy did not change for any state, we have found the optimal policy.
+        policy_stable = np.array_equal(best_idx, policy_idx)
+        policy_idx = best_idx
         if policy_stable:
             break
 
+    policy = {s: env.action_keys[a] for s, a in zip(states, policy_idx)}
+    policy[env.goal_pos] = ''
+    v = dict(zip(states, V.tolist()))
+
     print(f'Converged after {iteration} iterations.')
-    return v, policy, history
+    return v, policy, np.stack(history)
 
 
 def truncated_policy_iteration(env, gamma=0.9, j_truncate=5):
@@ -145,53 +251,56 @@ def truncated_policy_iteration(env, gamma=0.9, j_truncate=5):
     :param env: An instance of the environment.
     :param gamma: The discount factor for future rewards (float).
     :param j_truncate: The fixed number of iterations for the policy evaluation step.
-    :return: A tuple (v, policy, history) where v is the optimal value function (dict) and policy is the optimal policy (dict), and history is a list of value history.
+    :return: A tuple (v, policy, history) where v is the optimal value function (dict) and policy is the optimal policy (dict), and history is an array of shape (iterations + 1, n_states) of value snapshots whose columns follow env.states.
     """
-    # Initialize a random policy and a zero value function.
-    policy = {s: random.choice(env.action_keys) for s in env.states if s != env.goal_pos}
-    policy[env.goal_pos] = ''
-    v = {state: 0 for state in env.states}
+    states, state_to_idx, NS, R = build_transition_tables(env)
+    goal_idx = state_to_idx[env.goal_pos]
+    rows = np.arange(len(states))
+
+    # Initialize a random policy (as action indices) and a zero value function.
+    policy_idx = np.array([random.randrange(len(env.action_keys)) if s != env.goal_pos else 0 for s in states])
+    V = np.zeros(len(states))
+    # Second buffer for the evaluation sweeps; the two are swapped instead of allocating a new array per sweep.
+    V_next = np.empty_like(V)
     iteration = 0
 
-    # List to store history.
-    history = [v.copy()]
+    # Store the history of the entire value function as compact float32 snapshots.
+    history = [V.astype(np.float32)]
 
     # Loop until the policy is stable.
     while True:
         iteration += 1
 
         # --- 1. Truncated Policy Evaluation ---
+        # The policy is fixed during evaluation, so its transitions and rewards are gathered once.
+        ns_pi = NS[rows, policy_idx]
+        r_pi = R[rows, policy_idx]
         # Run the evaluation step for a fixed number of iterations (`j_truncate`).
+        # Each sweep reads only the previous iteration's values.
         for _ in range(j_truncate):
-            v_old = v.copy()  # Use a copy to ensure updates are based on the previous iteration's values.
-            for s in env.states:
-                if s == env.goal_pos: continue
-                action = policy[s]
-                next_s, reward, _ = env.step(s, action)
-                v[s] = reward + gamma * v_old[next_s]
+            np.take(V, ns_pi, out=V_next)
+            V_next *= gamma
+            V_next += r_pi
+            V, V_next = V_next, V
+        # The absorbing goal row keeps v(goal) = 0 without any branching in the sweep.
+        assert V[goal_idx] == 0.0
 
         # Record value after the truncated evaluation.
-        history.append(v.copy())
+        history.append(V.astype(np.float32))
 
         # --- 2. Policy Improvement ---
         # Greedily improve the policy based on the partially evaluated value function.
-        policy_stable = True
-        for s in env.states:
-            if s == env.goal_pos: continue
-            old_action = policy[s]
-            action_values = {}
-            for action in env.action_keys:
-                next_s, reward, _ = env.step(s, action)
-                q_value = reward + gamma * v[next_s]
-                action_values[action] = q_value
-            best_action = max(action_values, key=action_values.get)
-            policy[s] = best_action
-            if old_action != best_action:
-                policy_stable = False
+        _, best_idx = _bellman_sweep(V, NS, R, gamma)
+        policy_stable = np.array_equal(best_idx, policy_idx)
+        policy_idx = best_idx
 
         # If the policy has not changed, it has converged.
         if policy_stable:
             break
 
+    policy = {s: env.action_keys[a] for s, a in zip(states, policy_idx)}
+    policy[env.goal_pos] = ''
+    v = dict(zip(states, V.tolist()))
+
     print(f'Converged after {iteration} iterations.')
-    return v, policy, history
+    return v, policy, np.stack(history)
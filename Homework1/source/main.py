@@ -34,6 +34,8 @@ maze_env.render()
 # Dictionaries to store results for combined plot
 histories_for_plot = {}
 final_v_values = {}
+# Column of the start state in the value histories (columns follow the state ordering of the environment).
+start_idx = maze_env.states.index(maze_env.start_pos)
 
 
 # --- 2. Value Iteration ---
@@ -44,7 +46,7 @@ V_vi, policy_vi, v_history_vi = value_iteration(maze_env)
 
 # Extract start state value history for the convergence plot
 final_v_values['Value Iteration'] = V_vi
-histories_for_plot['Value Iteration'] = [v[maze_env.start_pos] for v in v_history_vi]
+histories_for_plot['Value Iteration'] = v_history_vi[:, start_idx].tolist()
 
 # Display the resulting policy visually on the maze grid.
 print("Optimal Policy Found:")
@@ -62,7 +64,7 @@ V_pi, policy_pi, v_history_pi = policy_iteration(maze_env)
 
 # Extract start state value history for the convergence plot
 final_v_values['Policy Iteration'] = V_pi
-histories_for_plot['Policy Iteration'] = [v[maze_env.start_pos] for v in v_history_pi]
+histories_for_plot['Policy Iteration'] = v_history_pi[:, start_idx].tolist()
 
 # Display the resulting policy visually on the maze grid.
 print("Optimal Policy Found:")
@@ -80,7 +82,7 @@ V_tpi, policy_tpi, v_history_tpi = truncated_policy_iteration(maze_env)
 
 # Extract start state value history for the convergence plot
 final_v_values['Truncated Policy Iteration'] = V_tpi
-histories_for_plot['Truncated Policy Iteration'] = [v[maze_env.start_pos] for v in v_history_tpi]
+histories_for_plot['Truncated Policy Iteration'] = v_history_tpi[:, start_idx].tolist()
 
 # Display the resulting policy visually on the maze grid.
 print("Optimal Policy Found:")
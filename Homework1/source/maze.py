@@ -33,7 +33,8 @@ class MazeEnvironment:
         if maze is None:
             self.maze = maze3
         else:
-            self.maze = np.array(maze)
+            # Arrays are shared rather than copied; the environment never writes to its layout.
+            self.maze = np.asarray(maze)
 
         # Validate that the maze contains exactly one start and one goal point.
         if 2 not in self.maze or 3 not in self.maze:
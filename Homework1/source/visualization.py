@@ -76,7 +76,7 @@ def visualize_value_function(env, v, title="State-Value Function (V*)"):
 def plot_value_function_snapshots(env, v_history, algorithm_name, num_snapshots=8):
     """Plots several snapshots of the value function's evolution in a grid.
     :param env: The maze environment instance.
-    :param v_history: A list of value function dictionaries from the entire iteration.
+    :param v_history: An array of value function snapshots of shape (iterations, n_states), with columns ordered as env.states.
     :param algorithm_name: The name of the algorithm for the figure's main title.
     :param num_snapshots: The number of snapshots to display (e.g., 6 or 8).
     """
@@ -88,11 +88,12 @@ def plot_value_function_snapshots(env, v_history, algorithm_name, num_snapshots=
     # Select evenly spaced indices from the history, including the first and last frames.
     indices = np.linspace(0, len(v_history) - 1, num=num_snapshots, dtype=int)
 
+    # Grid coordinates of each column of the history.
+    rows, cols = np.array(env.states).T
+
     # Determine the global color scale from the final value function.
-    v_final = v_history[-1]
     final_grid = np.full(env.maze.shape, np.nan)
-    for state, value in v_final.items():
-        final_grid[state] = value
+    final_grid[rows, cols] = v_history[-1]
 
     vmin = np.nanmin(final_grid)
     vmax = 0.0  # The goal state is the maximum value at 0.0
@@ -118,11 +119,8 @@ def plot_value_function_snapshots(env, v_history, algorithm_name, num_snapshots=
             continue
 
         frame_idx = indices[i]
-        v = v_history[frame_idx]
-
         value_grid = np.full(env.maze.shape, np.nan)
-        for state, value in v.items():
-            value_grid[state] = value
+        value_grid[rows, cols] = v_history[frame_idx]
 
         # Use the global vmin and vmax for consistent coloring
         im = ax.imshow(value_grid, cmap='viridis', interpolation='nearest', vmin=vmin, vmax=vmax)
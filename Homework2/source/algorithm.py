@@ -14,179 +14,472 @@ This code is licensed under GNU Affero General Public License v3 (AGPLv3) with a
 Full AGPLv3 text available in LICENSE file or at <https://www.gnu.org/licenses/agpl-3.0.html>
 """
 
-import random
-from collections import defaultdict, deque
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Tuple
+
+import numpy as np
+from numba import njit, prange
 from tqdm import tqdm
 
+if TYPE_CHECKING:
+    from cliffwalk import CliffWalkEnv
+
+# A grid position (row, col), and the (q_table, policy, history) triple returned by every training function.
+State = Tuple[int, int]
+TrainingResult = Tuple[Dict[State, np.ndarray], Dict[State, str], np.ndarray]
 
-def choose_action_e_greedy(q_table, state, actions, epsilon):
+
+@njit(cache=True, fastmath=True)
+def choose_action_e_greedy(q_table, state, epsilon):
     """Chooses an action using an epsilon-greedy policy.
-    :param q_table: The Q-table mapping states to action-values.
-    :param state: The current state.
-    :param actions: A list of possible actions from the state.
+    :param q_table: The Q-table as an array of shape (n_states, n_actions).
+    :param state: The index of the current state.
     :param epsilon: The probability of choosing a random action (exploration rate).
-    :return: The chosen action.
+    :return: The index of the chosen action.
     """
-    if random.uniform(0, 1) < epsilon:
+    n_actions = q_table.shape[1]
+    if np.random.random() < epsilon:
         # Explore: choose a random action
-        return random.choice(actions)
-    else:
-        # Exploit: choose the best known action
-        q_values = q_table[state]
-        # Find the maximum Q-value
-        max_q = max(q_values.values())
-        # Get all actions that have the maximum Q-value (to handle ties)
-        best_actions = [action for action, q in q_values.items() if q == max_q]
-        return random.choice(best_actions)
-
-
-def q_learning(env, episodes=500, alpha=0.1, gamma=0.9, epsilon=0.1):
-    """Solves the environment using the Q-learning algorithm (off-policy TD control).
+        return np.random.randint(n_actions)
+
+    # Exploit: choose the best known action, sampling uniformly among ties in a single pass
+    best_action = 0
+    max_q = q_table[state, 0]
+    n_ties = 1
+    for a in range(1, n_actions):
+        q = q_table[state, a]
+        if q > max_q:
+            best_action = a
+            max_q = q
+            n_ties = 1
+        elif q == max_q:
+            n_ties += 1
+            if np.random.randint(n_ties) == 0:
+                best_action = a
+    return best_action
+
+
+@njit(cache=True, fastmath=True)
+def _seed_kernels(seed):
+    """Seeds the random stream used inside compiled code, which is separate from NumPy's global generator.
+    :param seed: An integer seed.
+    """
+    np.random.seed(seed)
+
+
+def _seed_from(rng: Optional[np.random.Generator]) -> None:
+    """Seeds the compiled kernels from a NumPy Generator, if one is given.
+    :param rng: A numpy.random.Generator, or None to leave the kernels' random stream untouched.
+    """
+    if rng is not None:
+        _seed_kernels(rng.integers(np.iinfo(np.int32).max))
+
+
+def _q_table_to_dict(env: 'CliffWalkEnv', q_table: np.ndarray, visited: np.ndarray) -> Dict[State, np.ndarray]:
+    """Exposes an array Q-table as a mapping for the states encountered during training.
     :param env: An instance of the environment.
-    :param episodes: The total number of episodes to train for.
-    :param alpha: The learning rate (float).
-    :param gamma: The discount factor for future rewards (float).
-    :param epsilon: The exploration rate for the epsilon-greedy policy (float).
-    :return: A tuple (q_table, policy, history) where:
-             - q_table is the learned Q-value function (dict).
-             - policy is the optimal policy derived from the Q-table (dict).
-             - history is a list of total rewards for each episode.
+    :param q_table: The Q-table as an array of shape (n_states, n_actions).
+    :param visited: A boolean mask of the states encountered during training.
+    :return: A dict mapping each visited state to its row of action-values (a view, ordered like env.action_keys).
     """
-    # Initialize Q-table with zeros for all state-action pairs
-    q_table = defaultdict(lambda: {action: 0.0 for action in env.action_keys})
-    history = []
+    # Rows are views into the contiguous Q-table, so no per-action dicts are built.
+    return {env.states[i]: q_table[i] for i in np.flatnonzero(visited)}
 
-    for _ in tqdm(range(episodes), desc="Q-learning"):
-        state = env.start_pos
-        done = False
-        total_reward = 0
 
-        while not done:
-            # Choose action using the epsilon-greedy policy based on the current Q-table
-            action = choose_action_e_greedy(q_table, state, env.action_keys, epsilon)
+def _derive_policy(env: 'CliffWalkEnv', q_table: np.ndarray, visited: np.ndarray) -> Dict[State, str]:
+    """Derives the greedy policy for the states encountered during training.
+    :param env: An instance of the environment.
+    :param q_table: The Q-table as an array of shape (n_states, n_actions).
+    :param visited: A boolean mask of the states encountered during training.
+    :return: A dict mapping each visited state to its greedy action (ties resolve to the first action).
+    """
+    visited_idx = np.flatnonzero(visited)
+    best_actions = q_table[visited_idx].argmax(axis=1)
+    return {env.states[i]: env.action_keys[a] for i, a in zip(visited_idx, best_actions)}
+
 
-            # Take the action and observe the outcome
-            next_state, reward, done = env.step(state, action)
-            total_reward += reward
+def _kernel_tables(env: 'CliffWalkEnv') -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Collects the environment's transition tables in the dtypes the compiled kernels expect.
+    :param env: An instance of the environment.
+    :return: A tuple (NS, R, DONE) where R is a float32 copy of the reward table, so the float32 Q-table updates
+             are not upcast; the environment's own float64 table is left untouched.
+    """
+    return env.next_state_table, env.reward_table.astype(np.float32), env.done_table
 
-            # Q-learning update rule
-            old_value = q_table[state][action]
-            # Find the best Q-value for the next state (greedy part)
-            next_max = max(q_table[next_state].values())
 
-            # Update Q-value: Q(s, a) <- Q(s, a) + alpha * [R + gamma * max_a' Q(s', a') - Q(s, a)]
-            td_target = reward + gamma * next_max
-            td_error = td_target - old_value
-            q_table[state][action] = old_value + alpha * td_error
+@njit(cache=True, fastmath=True)
+def _q_learning_episode(q_table, NS, R, DONE, visited, start, alpha, gamma, epsilon):
+    """Runs a single Q-learning episode, updating the Q-table in place.
+    :return: The total reward collected during the episode.
+    """
+    state = start
+    visited[state] = True
+    done = False
+    total_reward = 0.0
 
-            state = next_state
+    while not done:
+        # Choose action using the epsilon-greedy policy based on the current Q-table
+        action = choose_action_e_greedy(q_table, state, epsilon)
 
-        history.append(total_reward)
+        # Take the action and observe the outcome
+        next_state = NS[state, action]
+        reward = R[state, action]
+        done = DONE[state, action]
+        visited[next_state] = True
+        total_reward += reward
 
-    # Derive the final policy from the learned Q-table
-    policy = {s: max(q_table[s], key=q_table[s].get) for s in q_table}
-    return q_table, policy, history
+        # Q-learning update rule
+        old_value = q_table[state, action]
+        # Find the best Q-value for the next state (greedy part)
+        next_max = q_table[next_state].max()
 
+        # Update Q-value: Q(s, a) <- Q(s, a) + alpha * [R + gamma * max_a' Q(s', a') - Q(s, a)]
+        td_target = reward + gamma * next_max
+        td_error = td_target - old_value
+        q_table[state, action] = old_value + alpha * td_error
 
-def sarsa(env, episodes=500, alpha=0.1, gamma=0.9, epsilon=0.1):
-    """Solves the environment using the SARSA algorithm (on-policy TD control).
+        state = next_state
+
+    return total_reward
+
+
+@njit(cache=True, fastmath=True)
+def _sarsa_episode(q_table, NS, R, DONE, visited, start, alpha, gamma, epsilon):
+    """Runs a single SARSA episode, updating the Q-table in place.
+    :return: The total reward collected during the episode.
+    """
+    state = start
+    visited[state] = True
+    done = False
+    total_reward = 0.0
+
+    # Choose the first action based on the policy
+    action = choose_action_e_greedy(q_table, state, epsilon)
+
+    while not done:
+        # Take action and observe outcome
+        next_state = NS[state, action]
+        reward = R[state, action]
+        done = DONE[state, action]
+        visited[next_state] = True
+        total_reward += reward
+
+        # Choose the *next* action based on the policy for the *next* state
+        next_action = choose_action_e_greedy(q_table, next_state, epsilon)
+
+        # SARSA update rule
+        old_value = q_table[state, action]
+        # Get the Q-value for the next state and the action chosen for it
+        next_value = q_table[next_state, next_action]
+
+        # Update Q-value: Q(s, a) <- Q(s, a) + alpha * [R + gamma * Q(s', a') - Q(s, a)]
+        td_target = reward + gamma * next_value
+        td_error = td_target - old_value
+        q_table[state, action] = old_value + alpha * td_error
+
+        # Move to the next state and action
+        state = next_state
+        action = next_action
+
+    return total_reward
+
+
+@njit(cache=True, fastmath=True)
+def _expected_sarsa_episode(q_table, NS, R, DONE, visited, start, alpha, gamma, epsilon):
+    """Runs a single Expected SARSA episode, updating the Q-table in place.
+    :return: The total reward collected during the episode.
+    """
+    # Every action receives epsilon / |A| probability mass; the greedy action additionally gets 1 - epsilon.
+    eps_over_a = epsilon / q_table.shape[1]
+    state = start
+    visited[state] = True
+    done = False
+    total_reward = 0.0
+
+    while not done:
+        action = choose_action_e_greedy(q_table, state, epsilon)
+        next_state = NS[state, action]
+        reward = R[state, action]
+        done = DONE[state, action]
+        visited[next_state] = True
+        total_reward += reward
+
+        # Expected SARSA update rule
+        old_value = q_table[state, action]
+
+        # Calculate the expected Q-value of the next state under the epsilon-greedy policy
+        next_q_values = q_table[next_state]
+        expected_q = eps_over_a * next_q_values.sum() + (1 - epsilon) * next_q_values.max()
+
+        td_target = reward + gamma * expected_q
+        td_error = td_target - old_value
+        q_table[state, action] = old_value + alpha * td_error
+
+        state = next_state
+
+    return total_reward
+
+
+@njit(cache=True, fastmath=True)
+def _discounted_return(rewards_buf, head, count, gammas):
+    """Computes sum_i gamma^i * R_i over the `count` buffered rewards starting at slot `head` of the ring buffer.
+    :return: The discounted return of the buffered rewards.
+    """
+    n_slots = rewards_buf.shape[0]
+    G = 0.0
+    for i in range(count):
+        G += gammas[i] * rewards_buf[(head + i) % n_slots]
+    return G
+
+
+@njit(cache=True, fastmath=True)
+def _n_step_sarsa_episode(q_table, NS, R, DONE, visited, start, n_steps, alpha, epsilon,
+                          max_steps_per_episode, gammas, states_buf, actions_buf, rewards_buf):
+    """Runs a single n-step SARSA episode, updating the Q-table in place.
+    The buffers form a ring of the n most recent experiences, replacing a double-ended queue.
+    :return: The total reward collected during the episode.
+    """
+    state = start
+    visited[state] = True
+    done = False
+    total_reward = 0.0
+
+    # Choose initial action A_0 from S_0
+    action = choose_action_e_greedy(q_table, state, epsilon)
+
+    # head is the slot of the oldest buffered experience, count the number of buffered experiences
+    head = 0
+    count = 0
+    step_counter = 0
+    while not done and step_counter < max_steps_per_episode:
+        # Take action A_t, observe R_t+1 and S_t+1
+        next_state = NS[state, action]
+        reward = R[state, action]
+        done = DONE[state, action]
+        visited[next_state] = True
+        total_reward += reward
+
+        # Store the experience (S_t, A_t, R_t+1)
+        slot = (head + count) % n_steps
+        states_buf[slot] = state
+        actions_buf[slot] = action
+        rewards_buf[slot] = reward
+        count += 1
+
+        # Choose next action A_t+1 from S_t+1
+        if not done:
+            next_action = choose_action_e_greedy(q_table, next_state, epsilon)
+        else:
+            # No next action if the episode terminates
+            next_action = -1
+
+        # If we have collected n steps, we can update the Q-value for the state that was n steps ago.
+        if count == n_steps:
+            # G = R_t+1 + gamma*R_t+2 + ...
+            G = _discounted_return(rewards_buf, head, count, gammas)
+
+            # Add the bootstrap value if the episode didn't end within n steps
+            # G = G + gamma^n * q(S_t+n, A_t+n)
+            if not done:
+                G += gammas[n_steps] * q_table[next_state, next_action]
+
+            # N-step SARSA update rule
+            s_tau = states_buf[head]
+            a_tau = actions_buf[head]
+            old_value = q_table[s_tau, a_tau]
+            td_error = G - old_value
+            q_table[s_tau, a_tau] = old_value + alpha * td_error
+
+            # Drop the oldest experience as it has now been used for an update
+            head = (head + 1) % n_steps
+            count -= 1
+
+        state = next_state
+        action = next_action
+        step_counter += 1
+
+    # After the episode ends, there are still (n-1) states in the buffer that need to be updated.
+    # Their returns are calculated until the end of the episode, with no bootstrapping term.
+    while count > 0:
+        G = _discounted_return(rewards_buf, head, count, gammas)
+
+        s_tau = states_buf[head]
+        a_tau = actions_buf[head]
+        old_value = q_table[s_tau, a_tau]
+        td_error = G - old_value
+        q_table[s_tau, a_tau] = old_value + alpha * td_error
+
+        head = (head + 1) % n_steps
+        count -= 1
+
+    return total_reward
+
+
+@njit(parallel=True, cache=True, fastmath=True)
+def _multi_seed_q_learning(q_tables, NS, R, DONE, visited, start, episodes, alpha, gamma, epsilon, histories):
+    """Trains one independent Q-learning agent per slab of `q_tables` in parallel, recording each agent's rewards."""
+    for k in prange(q_tables.shape[0]):
+        for episode in range(episodes):
+            histories[k, episode] = _q_learning_episode(q_tables[k], NS, R, DONE, visited[k], start,
+                                                        alpha, gamma, epsilon)
+
+
+@njit(parallel=True, cache=True, fastmath=True)
+def _multi_seed_sarsa(q_tables, NS, R, DONE, visited, start, episodes, alpha, gamma, epsilon, histories):
+    """Trains one independent SARSA agent per slab of `q_tables` in parallel, recording each agent's rewards."""
+    for k in prange(q_tables.shape[0]):
+        for episode in range(episodes):
+            histories[k, episode] = _sarsa_episode(q_tables[k], NS, R, DONE, visited[k], start,
+                                                   alpha, gamma, epsilon)
+
+
+def _run_multi_seed(env: 'CliffWalkEnv', kernel: Callable, n_seeds: int, episodes: int,
+                    alpha: float, gamma: float, epsilon: float) -> TrainingResult:
+    """Runs a parallel multi-agent kernel and averages the agents' results.
+    :return: A tuple (q_table, policy, history) built from the averaged Q-table and the mean rewards per episode.
+    """
+    NS, R, DONE = _kernel_tables(env)
+    start = env.state_to_idx[env.start_pos]
+    # Hyperparameters as float32 scalars so the float32 Q-table updates are not upcast
+    alpha, gamma, epsilon = np.float32(alpha), np.float32(gamma), np.float32(epsilon)
+
+    # Every agent owns a separate Q-table slab and visited mask, so the threads never share state.
+    q_tables = np.zeros((n_seeds, len(env.states), len(env.action_keys)), dtype=np.float32)
+    visited = np.zeros((n_seeds, len(env.states)), dtype=np.bool_)
+    histories = np.empty((n_seeds, episodes), dtype=np.float32)
+    kernel(q_tables, NS, R, DONE, visited, start, episodes, alpha, gamma, epsilon, histories)
+
+    # Average each state's Q-values over the agents that actually encountered it.
+    visit_counts = visited.sum(axis=0)
+    q_table = q_tables.sum(axis=0) / np.maximum(visit_counts, 1)[:, None]
+    visited = visit_counts > 0
+
+    policy = _derive_policy(env, q_table, visited)
+    q_table = _q_table_to_dict(env, q_table, visited)
+    return q_table, policy, histories.mean(axis=0)
+
+
+def multi_seed_q_learning(env: 'CliffWalkEnv', n_seeds: int = 8, episodes: int = 500,
+                          alpha: float = 0.1, gamma: float = 0.9, epsilon: float = 0.1) -> TrainingResult:
+    """Trains several independent Q-learning agents in parallel and averages their Q-tables.
     :param env: An instance of the environment.
-    :param episodes: The total number of episodes to train for.
+    :param n_seeds: The number of independent agents to train.
+    :param episodes: The number of episodes each agent trains for.
     :param alpha: The learning rate (float).
     :param gamma: The discount factor for future rewards (float).
     :param epsilon: The exploration rate for the epsilon-greedy policy (float).
-    :return: A tuple (q_table, policy, history)
+    :return: A tuple (q_table, policy, history) where history is the mean total reward per episode across agents.
     """
-    q_table = defaultdict(lambda: {action: 0.0 for action in env.action_keys})
-    history = []
-
-    for _ in tqdm(range(episodes), desc="SARSA"):
-        state = env.start_pos
-        done = False
-        total_reward = 0
-
-        # Choose the first action based on the policy
-        action = choose_action_e_greedy(q_table, state, env.action_keys, epsilon)
+    return _run_multi_seed(env, _multi_seed_q_learning, n_seeds, episodes, alpha, gamma, epsilon)
 
-        while not done:
-            # Take action and observe outcome
-            next_state, reward, done = env.step(state, action)
-            total_reward += reward
 
-            # Choose the *next* action based on the policy for the *next* state
-            next_action = choose_action_e_greedy(q_table, next_state, env.action_keys, epsilon)
+def multi_seed_sarsa(env: 'CliffWalkEnv', n_seeds: int = 8, episodes: int = 500,
+                     alpha: float = 0.1, gamma: float = 0.9, epsilon: float = 0.1) -> TrainingResult:
+    """Trains several independent SARSA agents in parallel and averages their Q-tables.
+    :param env: An instance of the environment.
+    :param n_seeds: The number of independent agents to train.
+    :param episodes: The number of episodes each agent trains for.
+    :param alpha: The learning rate (float).
+    :param gamma: The discount factor for future rewards (float).
+    :param epsilon: The exploration rate for the epsilon-greedy policy (float).
+    :return: A tuple (q_table, policy, history) where history is the mean total reward per episode across agents.
+    """
+    return _run_multi_seed(env, _multi_seed_sarsa, n_seeds, episodes, alpha, gamma, epsilon)
 
-            # SARSA update rule
-            old_value = q_table[state][action]
-            # Get the Q-value for the next state and the action chosen for it
-            next_value = q_table[next_state][next_action]
 
-            # Update Q-value: Q(s, a) <- Q(s, a) + alpha * [R + gamma * Q(s', a') - Q(s, a)]
-            td_target = reward + gamma * next_value
-            td_error = td_target - old_value
-            q_table[state][action] = old_value + alpha * td_error
+def q_learning(env: 'CliffWalkEnv', episodes: int = 500, alpha: float = 0.1, gamma: float = 0.9, epsilon: float = 0.1,
+               rng: Optional[np.random.Generator] = None) -> TrainingResult:
+    """Solves the environment using the Q-learning algorithm (off-policy TD control).
+    :param env: An instance of the environment.
+    :param episodes: The total number of episodes to train for.
+    :param alpha: The learning rate (float).
+    :param gamma: The discount factor for future rewards (float).
+    :param epsilon: The exploration rate for the epsilon-greedy policy (float).
+    :param rng: An optional numpy.random.Generator used to seed the exploration, making the run reproducible.
+    :return: A tuple (q_table, policy, history) where:
+             - q_table is the learned Q-value function (dict of action-value arrays, ordered like env.action_keys).
+             - policy is the optimal policy derived from the Q-table (dict).
+             - history is a float32 array of total rewards for each episode.
+    """
+    NS, R, DONE = _kernel_tables(env)
+    start = env.state_to_idx[env.start_pos]
+    _seed_from(rng)
+    # Hyperparameters as float32 scalars so the float32 Q-table updates are not upcast
+    alpha, gamma, epsilon = np.float32(alpha), np.float32(gamma), np.float32(epsilon)
 
-            # Move to the next state and action
-            state = next_state
-            action = next_action
+    # Initialize a float32 Q-table with zeros for all state-action pairs, indexed like the environment's transition tables
+    q_table = np.zeros((len(env.states), len(env.action_keys)), dtype=np.float32)
+    visited = np.zeros(len(env.states), dtype=np.bool_)
+    # Rewards per episode, preallocated instead of grown as a list
+    history = np.empty(episodes, dtype=np.float32)
 
-        history.append(total_reward)
+    for episode in tqdm(range(episodes), desc="Q-learning"):
+        history[episode] = _q_learning_episode(q_table, NS, R, DONE, visited, start, alpha, gamma, epsilon)
 
-    policy = {s: max(q_table[s], key=q_table[s].get) for s in q_table}
+    # Derive the final policy from the learned Q-table
+    policy = _derive_policy(env, q_table, visited)
+    q_table = _q_table_to_dict(env, q_table, visited)
     return q_table, policy, history
 
 
-def expected_sarsa(env, episodes=500, alpha=0.1, gamma=0.9, epsilon=0.1):
-    """Solves the environment using the Expected SARSA algorithm.
+def sarsa(env: 'CliffWalkEnv', episodes: int = 500, alpha: float = 0.1, gamma: float = 0.9, epsilon: float = 0.1,
+          rng: Optional[np.random.Generator] = None) -> TrainingResult:
+    """Solves the environment using the SARSA algorithm (on-policy TD control).
     :param env: An instance of the environment.
     :param episodes: The total number of episodes to train for.
     :param alpha: The learning rate (float).
     :param gamma: The discount factor for future rewards (float).
     :param epsilon: The exploration rate for the epsilon-greedy policy (float).
+    :param rng: An optional numpy.random.Generator used to seed the exploration, making the run reproducible.
     :return: A tuple (q_table, policy, history)
     """
-    q_table = defaultdict(lambda: {action: 0.0 for action in env.action_keys})
-    history = []
-
-    for _ in tqdm(range(episodes), desc="Expected SARSA"):
-        state = env.start_pos
-        done = False
-        total_reward = 0
+    NS, R, DONE = _kernel_tables(env)
+    start = env.state_to_idx[env.start_pos]
+    _seed_from(rng)
+    alpha, gamma, epsilon = np.float32(alpha), np.float32(gamma), np.float32(epsilon)
 
-        while not done:
-            action = choose_action_e_greedy(q_table, state, env.action_keys, epsilon)
-            next_state, reward, done = env.step(state, action)
-            total_reward += reward
+    q_table = np.zeros((len(env.states), len(env.action_keys)), dtype=np.float32)
+    visited = np.zeros(len(env.states), dtype=np.bool_)
+    history = np.empty(episodes, dtype=np.float32)
 
-            # Expected SARSA update rule
-            old_value = q_table[state][action]
+    for episode in tqdm(range(episodes), desc="SARSA"):
+        history[episode] = _sarsa_episode(q_table, NS, R, DONE, visited, start, alpha, gamma, epsilon)
 
-            # Calculate the expected Q-value of the next state
-            next_q_values = q_table[next_state]
-            best_action = max(next_q_values, key=next_q_values.get)
-            num_actions = len(env.action_keys)
+    policy = _derive_policy(env, q_table, visited)
+    q_table = _q_table_to_dict(env, q_table, visited)
+    return q_table, policy, history
 
-            expected_q = 0.0
-            for a in env.action_keys:
-                if a == best_action:
-                    prob = 1 - epsilon + (epsilon / num_actions)
-                else:
-                    prob = epsilon / num_actions
-                expected_q += prob * next_q_values[a]
 
-            td_target = reward + gamma * expected_q
-            td_error = td_target - old_value
-            q_table[state][action] = old_value + alpha * td_error
+def expected_sarsa(env: 'CliffWalkEnv', episodes: int = 500, alpha: float = 0.1, gamma: float = 0.9,
+                   epsilon: float = 0.1, rng: Optional[np.random.Generator] = None) -> TrainingResult:
+    """Solves the environment using the Expected SARSA algorithm.
+    :param env: An instance of the environment.
+    :param episodes: The total number of episodes to train for.
+    :param alpha: The learning rate (float).
+    :param gamma: The discount factor for future rewards (float).
+    :param epsilon: The exploration rate for the epsilon-greedy policy (float).
+    :param rng: An optional numpy.random.Generator used to seed the exploration, making the run reproducible.
+    :return: A tuple (q_table, policy, history)
+    """
+    NS, R, DONE = _kernel_tables(env)
+    start = env.state_to_idx[env.start_pos]
+    _seed_from(rng)
+    alpha, gamma, epsilon = np.float32(alpha), np.float32(gamma), np.float32(epsilon)
 
-            state = next_state
+    q_table = np.zeros((len(env.states), len(env.action_keys)), dtype=np.float32)
+    visited = np.zeros(len(env.states), dtype=np.bool_)
+    history = np.empty(episodes, dtype=np.float32)
 
-        history.append(total_reward)
+    for episode in tqdm(range(episodes), desc="Expected SARSA"):
+        history[episode] = _expected_sarsa_episode(q_table, NS, R, DONE, visited, start, alpha, gamma, epsilon)
 
-    policy = {s: max(q_table[s], key=q_table[s].get) for s in q_table}
+    policy = _derive_policy(env, q_table, visited)
+    q_table = _q_table_to_dict(env, q_table, visited)
     return q_table, policy, history
 
 
-def n_step_sarsa(env, n_steps=5, episodes=500, alpha=0.1, gamma=0.9, epsilon=0.1, max_steps_per_episode=1000):
+def n_step_sarsa(env: 'CliffWalkEnv', n_steps: int = 5, episodes: int = 500, alpha: float = 0.1, gamma: float = 0.9,
+                 epsilon: float = 0.1, max_steps_per_episode: int = 1000,
+                 rng: Optional[np.random.Generator] = None) -> TrainingResult:
     """Solves the environment using n-step SARSA, strictly following the TD update rule.
     :param env: An instance of the environment.
     :param n_steps: The number of steps 'n' for the lookahead return.
@@ -195,91 +488,57 @@ def n_step_sarsa(env, n_steps=5, episodes=500, alpha=0.1, gamma=0.9, epsilon=0.1
     :param gamma: The discount factor for future rewards (float).
     :param epsilon: The exploration rate for the epsilon-greedy policy (float).
     :param max_steps_per_episode: A safeguard to prevent infinitely long episodes in complex mazes.
+    :param rng: An optional numpy.random.Generator used to seed the exploration, making the run reproducible.
     :return: A tuple (q_table, policy, history)
     """
-    q_table = defaultdict(lambda: {action: 0.0 for action in env.action_keys})
-    history = []
-
-    for _ in tqdm(range(episodes), desc=f"{n_steps}-step SARSA"):
-        state = env.start_pos
-        done = False
-        total_reward = 0
-
-        # Use a deque for efficient storage of the recent trajectory
-        trajectory = deque()
-
-        # Choose initial action A_0 from S_0
-        action = choose_action_e_greedy(q_table, state, env.action_keys, epsilon)
-
-        step_counter = 0
-        while not done and step_counter < max_steps_per_episode:
-            # Take action A_t, observe R_t+1 and S_t+1
-            next_state, reward, done = env.step(state, action)
-            total_reward += reward
-
-            # Store the experience (S_t, A_t, R_t+1)
-            trajectory.append((state, action, reward))
-
-            # Choose next action A_t+1 from S_t+1
-            if not done:
-                next_action = choose_action_e_greedy(q_table, next_state, env.action_keys, epsilon)
-            else:
-                # No next action if the episode terminates
-                next_action = None
-
-                # If we have collected at least n steps, we can update the Q-value for the state that was n steps ago.
-            if len(trajectory) >= n_steps:
-                # The state to update is S_tau, which is the oldest in our trajectory buffer
-                s_tau, a_tau, _ = trajectory[0]
-
-                # G = R_t+1 + gamma*R_t+2 + ...
-                G = 0
-                for i in range(n_steps):
-                    # Get reward R from (S, A, R) tuple
-                    r = trajectory[i][2]
-                    G += (gamma ** i) * r
-
-                # Add the bootstrap value if the episode didn't end within n steps
-                # G = G + gamma^n * q(S_t+n, A_t+n)
-                if not done:
-                    # S_t+n is the current `next_state`
-                    # A_t+n is the current `next_action`
-                    G += (gamma ** n_steps) * q_table[next_state][next_action]
-
-                # N-step SARSA update rule
-                old_value = q_table[s_tau][a_tau]
-                td_error = G - old_value
-                q_table[s_tau][a_tau] = old_value + alpha * td_error
-
-                # Remove the oldest experience as it has now been used for an update
-                trajectory.popleft()
-
-            # Update state and action for the next iteration (Line 8 of pseudocode)
-            state = next_state
-            action = next_action
-            step_counter += 1
-
-        # After the episode ends, there are still (n-1) states in the trajectory
-        # that need to be updated. Their returns are calculated until the end of the episode.
-        while len(trajectory) > 0:
-            s_tau, a_tau, _ = trajectory[0]
-
-            # Calculate the return G for the remaining items. Since the episode is over,
-            # there is no bootstrapping term.
-            G = 0
-            for i in range(len(trajectory)):
-                r = trajectory[i][2]
-                G += (gamma ** i) * r
-
-            # Perform the update
-            old_value = q_table[s_tau][a_tau]
-            td_error = G - old_value
-            q_table[s_tau][a_tau] = old_value + alpha * td_error
-
-            # Remove the experience and continue until the buffer is empty
-            trajectory.popleft()
+    NS, R, DONE = _kernel_tables(env)
+    start = env.state_to_idx[env.start_pos]
+    _seed_from(rng)
+    alpha, gamma, epsilon = np.float32(alpha), np.float32(gamma), np.float32(epsilon)
+
+    q_table = np.zeros((len(env.states), len(env.action_keys)), dtype=np.float32)
+    visited = np.zeros(len(env.states), dtype=np.bool_)
+    history = np.empty(episodes, dtype=np.float32)
+
+    # Discount factors gamma^0 ... gamma^n (the last one weights the bootstrap term), computed once per run
+    gammas = gamma ** np.arange(n_steps + 1, dtype=np.float32)
+    # Ring buffers of the n most recent experiences, allocated once and reused by every episode
+    states_buf = np.empty(n_steps, dtype=NS.dtype)
+    actions_buf = np.empty(n_steps, dtype=np.int32)
+    rewards_buf = np.empty(n_steps, dtype=np.float32)
+
+    for episode in tqdm(range(episodes), desc=f"{n_steps}-step SARSA"):
+        history[episode] = _n_step_sarsa_episode(q_table, NS, R, DONE, visited, start, n_steps, alpha, epsilon,
+                                                 max_steps_per_episode, gammas, states_buf, actions_buf, rewards_buf)
+
+    policy = _derive_policy(env, q_table, visited)
+    q_table = _q_table_to_dict(env, q_table, visited)
+    return q_table, policy, history
 
-        history.append(total_reward)
 
-    policy = {s: max(q_table[s], key=q_table[s].get) for s in q_table}
-    return q_table, policy, history
+def _warmup() -> None:
+    """Runs every episode kernel once on a tiny two-state problem so that JIT compilation happens at import time.
+    With cache=True the compiled machine code is written to __pycache__ and simply loaded on later imports.
+    The parallel multi-seed drivers are left out: running them would start numba's threading layer in every
+    process that imports this module, and they compile (or load from the cache) on their first call anyway.
+    """
+    # State 0 leads to the terminal state 1 under every action; dtypes match the real CliffWalkEnv tables.
+    NS = np.ones((2, 4), dtype=np.int16)
+    R = np.full((2, 4), -1.0, dtype=np.float32)
+    DONE = np.ones((2, 4), dtype=np.bool_)
+    alpha, gamma, epsilon = np.float32(0.1), np.float32(0.9), np.float32(0.1)
+
+    q_table = np.zeros((2, 4), dtype=np.float32)
+    visited = np.zeros(2, dtype=np.bool_)
+    for kernel in (_q_learning_episode, _sarsa_episode, _expected_sarsa_episode):
+        kernel(q_table, NS, R, DONE, visited, 0, alpha, gamma, epsilon)
+
+    n_steps = 2
+    gammas = gamma ** np.arange(n_steps + 1, dtype=np.float32)
+    _n_step_sarsa_episode(q_table, NS, R, DONE, visited, 0, n_steps, alpha, epsilon, 10, gammas,
+                          np.empty(n_steps, dtype=NS.dtype), np.empty(n_steps, dtype=np.int32),
+                          np.empty(n_steps, dtype=np.float32))
+
+
+if __name__ != "__main__":
+    _warmup()
@@ -14,6 +14,8 @@ This code is licensed under GNU Affero General Public License v3 (AGPLv3) with a
 Full AGPLv3 text available in LICENSE file or at <https://www.gnu.org/licenses/agpl-3.0.html>
 """
 
+import sys
+
 import numpy as np
 
 from Homework1.source.maze import MazeEnvironment
@@ -42,8 +44,43 @@ class CliffWalkEnv(MazeEnvironment):
         # The parent will handle walls, boundaries, and goal rewards.
         super().__init__(maze=cliffwalk, reward_step=reward_step, reward_goal=reward_goal)
 
+        # Precompute the full transition tables once, indexed by the position of a state in self.states
+        # and of an action in self.action_keys, so that step() reduces to three array lookups.
+        # State indices use int16 whenever they fit; rewards stay float64 so step() returns them unchanged.
+        self.state_to_idx = {state: i for i, state in enumerate(self.states)}
+        # Flat (row * width + col) lookup from grid cells to state indices; walls map to -1.
+        self.cell_to_idx = np.full(self.height * self.width, -1, dtype=np.int32)
+        rows, cols = np.array(self.states).T
+        self.cell_to_idx[rows * self.width + cols] = np.arange(len(self.states))
+        self.action_to_idx = {action: k for k, action in enumerate(self.action_keys)}
+        n_states, n_actions = len(self.states), len(self.action_keys)
+        index_dtype = np.int16 if n_states <= np.iinfo(np.int16).max else np.int32
+        self.next_state_table = np.empty((n_states, n_actions), dtype=index_dtype)
+        self.reward_table = np.empty((n_states, n_actions), dtype=np.float64)
+        self.done_table = np.empty((n_states, n_actions), dtype=np.bool_)
+        for i, state in enumerate(self.states):
+            for k, action in enumerate(self.action_keys):
+                next_pos, reward, done = self.simulate_step(state, action)
+                self.next_state_table[i, k] = self.state_to_idx[next_pos]
+                self.reward_table[i, k] = reward
+                self.done_table[i, k] = done
+
     def step(self, current_pos, action):
-        """Executes an action and overrides the parent's step method to handle the cliff.
+        """Executes an action by looking up the precomputed transition tables.
+        :param current_pos: The agent's current state as a tuple (row, col).
+        :param action: The action to be taken (e.g., 'N', 'S', 'W', 'E').
+        :return: A tuple (next_pos, reward, done).
+        """
+        r, c = current_pos
+        i = self.cell_to_idx[r * self.width + c] if 0 <= r < self.height and 0 <= c < self.width else -1
+        k = self.action_to_idx.get(action)
+        if i < 0 or k is None:
+            # Positions or actions outside the tables (e.g. invalid actions) take the rule-based path.
+            return self.simulate_step(current_pos, action)
+        return self.states[self.next_state_table[i, k]], float(self.reward_table[i, k]), bool(self.done_table[i, k])
+
+    def simulate_step(self, current_pos, action):
+        """Computes the outcome of an action from the environment rules, extending the parent's logic with the cliff.
         :param current_pos: The agent's current state as a tuple (row, col).
         :param action: The action to be taken (e.g., 'N', 'S', 'W', 'E').
         :return: A tuple (next_pos, reward, done).
@@ -74,12 +111,11 @@ class CliffWalkEnv(MazeEnvironment):
 
     def render(self):
         """Overrides the parent's render method to display cliff tiles."""
-        symbols = {0: '⬜', 1: '⬛', 2: '✳️', 3: '✅', 4: '🔥'}
-        for r in range(self.height):
-            for c in range(self.width):
-                print(symbols[self.maze[r, c]], end="")
-            print()
-        print()
+        # Map the tile codes straight onto their symbols and emit the whole frame in one write.
+        # dtype=object keeps multi-codepoint emoji intact.
+        symbols = np.array(['⬜', '⬛', '✳️', '✅', '🔥'], dtype=object)
+        grid = symbols[self.maze]
+        sys.stdout.write('\n'.join(''.join(row) for row in grid) + '\n\n')
 
     def print_policy(self, policy):
         """Overrides the parent's policy printing to also show the cliff.
@@ -89,27 +125,15 @@ class CliffWalkEnv(MazeEnvironment):
         # Use dtype=object to prevent NumPy from truncating emoji characters.
         policy_grid = np.full(self.maze.shape, ' ', dtype=object)
 
-        # Populate the grid with policy actions
-        for state, action in policy.items():
-            if self.maze[state] != 1 and self.maze[state] != 3:
-                policy_grid[state] = policy_symbols[action]
-
-        # Overlay symbols for walls, cliff, and start position
-        for r in range(self.height):
-            for c in range(self.width):
-                if self.maze[r, c] == 1:
-                    policy_grid[r, c] = '⬛'
-                elif self.maze[r, c] == 2:
-                    policy_grid[r, c] = '✳️'
-                elif self.maze[r, c] == 3:
-                    policy_grid[r, c] = '✅'
-                # This handles the cliff in the child class
-                elif hasattr(self, 'reward_cliff') and self.maze[r, c] == 4:
-                    policy_grid[r, c] = '🔥'
-
-        # Print the final policy grid row by row.
-        for r in range(self.height):
-            for c in range(self.width):
-                print(policy_grid[r, c], end="")
-            print()
-        print()
+        # Populate the grid with policy actions in a single scatter.
+        if policy:
+            rows, cols = np.array(list(policy.keys())).T
+            policy_grid[rows, cols] = [policy_symbols.get(action, ' ') for action in policy.values()]
+
+        # Overlay symbols for walls, start, goal and cliff; open path tiles (code 0) keep their action.
+        tile_symbols = np.array([' ', '⬛', '✳️', '✅', '🔥'], dtype=object)
+        special = self.maze != 0
+        policy_grid[special] = tile_symbols[self.maze[special]]
+
+        # Print the final policy grid in one write.
+        sys.stdout.write('\n'.join(''.join(row) for row in policy_grid) + '\n\n')
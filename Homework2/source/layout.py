@@ -14,64 +14,97 @@ This code is licensed under GNU Affero General Public License v3 (AGPLv3) with a
 Full AGPLv3 text available in LICENSE file or at <https://www.gnu.org/licenses/agpl-3.0.html>
 """
 
+from functools import lru_cache
+
 import numpy as np
 
-# A simple 3x3 cliff walk layout for basic testing and debugging.
-cliffwalk1 = np.array([
-    [2, 0, 4],
-    [4, 0, 0],
-    [0, 0, 3]
-])
-
-# A 5x5 layout that includes both walls (1) and cliffs (4).
-# The goal is partially enclosed, requiring the agent to navigate around obstacles.
-cliffwalk2 = np.array([
-    [0, 0, 0, 0, 0],
-    [0, 4, 1, 1, 0],
-    [0, 4, 3, 1, 0],
-    [0, 4, 0, 1, 0],
-    [2, 4, 0, 0, 0]
-])
-
-# The classic 4x12 Cliff Walk environment as described in Sutton and Barto's textbook.
-# The entire bottom row between the start and goal is a cliff.
-cliffwalk3 = np.array([
-    [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-    [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-    [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-    [2, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 3]
-])
-
-# A large and complex 21x21 layout combining a maze structure with numerous cliff tiles.
-# This layout is suitable for testing the scalability and robustness of the learning algorithms in a more challenging and dangerous environment.
-cliffwalk4 = np.array([
-    [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 2, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-    [1, 0, 4, 0, 0, 0, 4, 0, 0, 0, 0, 0, 4, 0, 0, 0, 0, 0, 0, 0, 1],
-    [1, 0, 4, 0, 4, 4, 4, 0, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 0, 1],
-    [1, 0, 4, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-    [1, 0, 4, 0, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 4, 0, 1],
-    [1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 4, 0, 1, 0, 4, 0, 1],
-    [1, 4, 4, 0, 1, 0, 4, 0, 4, 4, 4, 4, 4, 4, 4, 0, 1, 0, 4, 0, 1],
-    [1, 0, 4, 0, 1, 0, 4, 0, 1, 0, 0, 0, 0, 0, 4, 0, 0, 0, 4, 0, 1],
-    [1, 0, 4, 0, 1, 0, 4, 0, 1, 0, 1, 1, 1, 0, 4, 0, 1, 1, 4, 0, 1],
-    [1, 0, 4, 0, 1, 0, 4, 0, 1, 0, 4, 0, 1, 0, 4, 0, 1, 0, 0, 0, 1],
-    [1, 0, 0, 0, 1, 0, 4, 0, 1, 0, 4, 0, 1, 0, 4, 0, 1, 0, 4, 0, 1],
-    [1, 0, 4, 0, 1, 0, 4, 0, 0, 0, 0, 0, 1, 0, 4, 0, 1, 0, 4, 0, 1],
-    [1, 0, 4, 0, 1, 0, 4, 1, 1, 1, 1, 0, 1, 0, 4, 0, 1, 0, 4, 0, 1],
-    [1, 0, 4, 0, 1, 0, 4, 0, 0, 0, 0, 0, 1, 0, 4, 0, 1, 0, 4, 0, 1],
-    [1, 4, 4, 0, 1, 0, 4, 4, 4, 4, 4, 4, 4, 4, 4, 0, 1, 0, 4, 0, 1],
-    [1, 0, 0, 0, 1, 0, 4, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 4, 0, 1],
-    [1, 0, 4, 0, 1, 0, 1, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 0, 4, 4, 1],
-    [1, 0, 4, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-    [1, 0, 4, 4, 4, 4, 4, 0, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 0, 1],
-    [1, 0, 4, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-    [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 3, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]
-])
-
-# A simple 4x11 maze layout for initialing cliffwalk environment.
-maze3 = np.array([
-    [0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0],
-    [0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0],
-    [0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0],
-    [2, 4, 4, 4, 4, 4, 4, 4, 4, 4, 3]
-])
+__all__ = ['cliffwalk1', 'cliffwalk2', 'cliffwalk3', 'cliffwalk4', 'maze3']
+
+# The layouts are kept as plain nested lists and only turned into arrays when first accessed.
+# Note that `from layout import *` goes through __all__ and therefore builds every layout; access them as
+# `layout.<name>` or import single names to keep the construction lazy.
+_RAW = {
+    # A simple 3x3 cliff walk layout for basic testing and debugging.
+    'cliffwalk1': [
+        [2, 0, 4],
+        [4, 0, 0],
+        [0, 0, 3]
+    ],
+
+    # A 5x5 layout that includes both walls (1) and cliffs (4).
+    # The goal is partially enclosed, requiring the agent to navigate around obstacles.
+    'cliffwalk2': [
+        [0, 0, 0, 0, 0],
+        [0, 4, 1, 1, 0],
+        [0, 4, 3, 1, 0],
+        [0, 4, 0, 1, 0],
+        [2, 4, 0, 0, 0]
+    ],
+
+    # The classic 4x12 Cliff Walk environment as described in Sutton and Barto's textbook.
+    # The entire bottom row between the start and goal is a cliff.
+    'cliffwalk3': [
+        [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [2, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 3]
+    ],
+
+    # A large and complex 21x21 layout combining a maze structure with numerous cliff tiles.
+    # This layout is suitable for testing the scalability and robustness of the learning algorithms in a more challenging and dangerous environment.
+    'cliffwalk4': [
+        [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 2, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
+        [1, 0, 4, 0, 0, 0, 4, 0, 0, 0, 0, 0, 4, 0, 0, 0, 0, 0, 0, 0, 1],
+        [1, 0, 4, 0, 4, 4, 4, 0, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 0, 1],
+        [1, 0, 4, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
+        [1, 0, 4, 0, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 4, 0, 1],
+        [1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 4, 0, 1, 0, 4, 0, 1],
+        [1, 4, 4, 0, 1, 0, 4, 0, 4, 4, 4, 4, 4, 4, 4, 0, 1, 0, 4, 0, 1],
+        [1, 0, 4, 0, 1, 0, 4, 0, 1, 0, 0, 0, 0, 0, 4, 0, 0, 0, 4, 0, 1],
+        [1, 0, 4, 0, 1, 0, 4, 0, 1, 0, 1, 1, 1, 0, 4, 0, 1, 1, 4, 0, 1],
+        [1, 0, 4, 0, 1, 0, 4, 0, 1, 0, 4, 0, 1, 0, 4, 0, 1, 0, 0, 0, 1],
+        [1, 0, 0, 0, 1, 0, 4, 0, 1, 0, 4, 0, 1, 0, 4, 0, 1, 0, 4, 0, 1],
+        [1, 0, 4, 0, 1, 0, 4, 0, 0, 0, 0, 0, 1, 0, 4, 0, 1, 0, 4, 0, 1],
+        [1, 0, 4, 0, 1, 0, 4, 1, 1, 1, 1, 0, 1, 0, 4, 0, 1, 0, 4, 0, 1],
+        [1, 0, 4, 0, 1, 0, 4, 0, 0, 0, 0, 0, 1, 0, 4, 0, 1, 0, 4, 0, 1],
+        [1, 4, 4, 0, 1, 0, 4, 4, 4, 4, 4, 4, 4, 4, 4, 0, 1, 0, 4, 0, 1],
+        [1, 0, 0, 0, 1, 0, 4, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 4, 0, 1],
+        [1, 0, 4, 0, 1, 0, 1, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 0, 4, 4, 1],
+        [1, 0, 4, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
+        [1, 0, 4, 4, 4, 4, 4, 0, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 0, 1],
+        [1, 0, 4, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
+        [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 3, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]
+    ],
+
+    # A simple 4x11 maze layout for initialing cliffwalk environment.
+    'maze3': [
+        [0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0],
+        [0, 1, 0, 1, 0, 1, 0, 1, 0, 1, 0],
+        [0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0],
+        [2, 4, 4, 4, 4, 4, 4, 4, 4, 4, 3]
+    ],
+}
+
+
+@lru_cache(maxsize=None)
+def get_layout(name):
+    """Builds a layout array on first use and returns the same array on every later call.
+    :param name: The name of the layout, e.g. 'cliffwalk3'.
+    :return: A read-only int8 array of tile codes.
+    """
+    layout = np.array(_RAW[name], dtype=np.int8)
+    # Layouts are shared by every environment built from them, so they are made read-only instead of copied.
+    layout.setflags(write=False)
+    return layout
+
+
+def __getattr__(name):
+    """Resolves module attributes such as `layout.cliffwalk3` lazily (PEP 562)."""
+    if name in _RAW:
+        return get_layout(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    """Lists the lazily built layouts alongside the regular module attributes."""
+    return sorted(list(globals()) + list(_RAW))
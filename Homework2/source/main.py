@@ -14,102 +14,118 @@ This code is licensed under GNU Affero General Public License v3 (AGPLv3) with a
 Full AGPLv3 text available in LICENSE file or at <https://www.gnu.org/licenses/agpl-3.0.html>
 """
 
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
 from algorithm import *
 from cliffwalk import CliffWalkEnv
-from layout import *
+import layout
 from visualization import *
 
 
-# --- 1. Environment Setup ---
-
-# Initialize the Cliff Walk environment.
-cliffwalk_env = CliffWalkEnv()
-# cliffwalk_env = CliffWalkEnv(cliffwalk=cliffwalk1)
-# cliffwalk_env = CliffWalkEnv(cliffwalk=cliffwalk2)
-# cliffwalk_env = CliffWalkEnv(cliffwalk=cliffwalk4)
+# Keyword arguments for the Cliff Walk environment; an empty dict selects the default layout.
+# Layouts are read as attributes of the `layout` module, so only the one selected here is ever built.
+ENV_KWARGS = {}
+# ENV_KWARGS = {'cliffwalk': layout.cliffwalk1}
+# ENV_KWARGS = {'cliffwalk': layout.cliffwalk2}
+# ENV_KWARGS = {'cliffwalk': layout.cliffwalk4}
 
 # Hyperparameters for the TD learning algorithms
 EPISODES = 500
 ALPHA = 0.5
 GAMMA = 1.0
 EPSILON = 0.1
-
-# Render the cliffwalk structure to the console for visual inspection.
-cliffwalk_env.render()
-
-# Dictionaries to store results for combined plot
-histories_for_plot = {}
-
-
-# --- 2. SARSA ---
-
-# Run the SARSA algorithm to find the optimal value function and policy.
-sarsa_q_table, sarsa_policy, sarsa_history = sarsa(cliffwalk_env, episodes=EPISODES, alpha=ALPHA, gamma=GAMMA, epsilon=EPSILON)
-histories_for_plot['SARSA'] = sarsa_history
-
-# Display the resulting policy visually on the grid.
-# Note SARSA's "safe" path far from the cliff.
-print("Final Policy Found by SARSA:")
-cliffwalk_env.print_policy(sarsa_policy)
-
-# Convert the learned Q-table to a V-table for visualization
-sarsa_v_table = q_to_v_table(sarsa_q_table)
-# Visualize the state-value function learned by SARSA
-visualize_value_function(cliffwalk_env, sarsa_v_table, "State-Value Function (V) for SARSA")
-
-
-# --- 3. Expected SARSA ---
-
-# Run the Expected SARSA algorithm to find the optimal value function and policy.
-sarsa_q_table, sarsa_policy, sarsa_history = expected_sarsa(cliffwalk_env, episodes=EPISODES, alpha=ALPHA, gamma=GAMMA, epsilon=EPSILON)
-histories_for_plot['Expected SARSA'] = sarsa_history
-
-# Display the resulting policy visually on the grid.
-# Note Expected SARSA's "safe" path far from the cliff.
-print("Final Policy Found by Expected SARSA:")
-cliffwalk_env.print_policy(sarsa_policy)
-
-# Convert the learned Q-table to a V-table for visualization
-sarsa_v_table = q_to_v_table(sarsa_q_table)
-# Visualize the state-value function learned by Expected SARSA
-visualize_value_function(cliffwalk_env, sarsa_v_table, "State-Value Function (V) for Expected SARSA")
-
-
-# --- 4. N-step SARSA ---
-
-# Run the N-step SARSA algorithm to find the optimal value function and policy.
-sarsa_q_table, sarsa_policy, sarsa_history = n_step_sarsa(cliffwalk_env, episodes=EPISODES, alpha=ALPHA, gamma=GAMMA, epsilon=EPSILON)
-histories_for_plot['N-step SARSA'] = sarsa_history
-
-# Display the resulting policy visually on the grid.
-# Note N-step SARSA's "safe" path far from the cliff.
-print("Final Policy Found by N-step SARSA:")
-cliffwalk_env.print_policy(sarsa_policy)
-
-# Convert the learned Q-table to a V-table for visualization
-sarsa_v_table = q_to_v_table(sarsa_q_table)
-# Visualize the state-value function learned by N-step SARSA
-visualize_value_function(cliffwalk_env, sarsa_v_table, "State-Value Function (V) for N-step SARSA")
-
-
-# --- 5. Q-learning ---
-
-# Run the Q-learning algorithm to find the optimal value function and policy.
-q_q_table, q_policy, q_history = q_learning(cliffwalk_env, episodes=EPISODES, alpha=ALPHA, gamma=GAMMA, epsilon=EPSILON)
-histories_for_plot['Q-learning'] = q_history
-
-# Display the resulting policy.
-# Note Q-learning's "optimal" but risky path along the cliff edge.
-print("Final Policy Found by Q-learning:")
-cliffwalk_env.print_policy(q_policy)
-
-# Convert the learned Q-table to a V-table
-q_v_table = q_to_v_table(q_q_table)
-# Visualize the state-value function learned by Q-learning
-visualize_value_function(cliffwalk_env, q_v_table, "State-Value Function (V) for Q-learning")
-
-
-# --- 6. Final Comparison Visualization ---
-
-# Plot the learning curves of both algorithms on the same graph to compare performance.
-plot_learning_curves(histories_for_plot)
+# A seeded generator makes the exploration reproducible; each worker receives its own copy of it.
+RNG = np.random.default_rng(0)
+HPARAMS = {'episodes': EPISODES, 'alpha': ALPHA, 'gamma': GAMMA, 'epsilon': EPSILON, 'rng': RNG}
+
+# The algorithms to compare, in the order their results are reported.
+# Expect the SARSA variants to learn a "safe" path far from the cliff, and Q-learning
+# the "optimal" but risky path along the cliff edge.
+ALGORITHMS = [
+    ('SARSA', sarsa),
+    ('Expected SARSA', expected_sarsa),
+    ('N-step SARSA', n_step_sarsa),
+    ('Q-learning', q_learning),
+]
+
+
+def run_algo(name, algo_fn, env_kwargs, hparams):
+    """Trains one algorithm on a freshly built environment; used as the worker of the process pool.
+    :param name: The display name of the algorithm.
+    :param algo_fn: The training function, e.g. sarsa or q_learning.
+    :param env_kwargs: Keyword arguments for CliffWalkEnv.
+    :param hparams: Keyword arguments for the training function.
+    :return: A tuple (name, q_table, policy, history).
+    """
+    # The environment is rebuilt inside the worker instead of being pickled over from the parent process.
+    env = CliffWalkEnv(**env_kwargs)
+    q_table, policy, history = algo_fn(env, **hparams)
+    return name, q_table, policy, history
+
+
+# The guard is required so that worker processes can import this module without re-running the experiment.
+if __name__ == '__main__':
+    # Without a display (e.g. batch runs on a Linux server) plots are rendered with Agg and saved as PNG files,
+    # which also skips initializing a GUI backend. The backend must be chosen before pyplot is imported.
+    headless = sys.platform.startswith('linux') and not os.environ.get('DISPLAY')
+    if headless:
+        import matplotlib
+        matplotlib.use('Agg')
+
+    # --- 1. Environment Setup ---
+
+    # Initialize the Cliff Walk environment used for rendering and displaying the results.
+    cliffwalk_env = CliffWalkEnv(**ENV_KWARGS)
+
+    # Render the cliffwalk structure to the console for visual inspection.
+    cliffwalk_env.render()
+
+    # --- 2. Training ---
+
+    # The algorithms are independent of each other, so each one is trained in its own process.
+    # Results are collected as soon as each worker finishes; the progress bars will interleave.
+    results = {}
+    # Workers are spawned rather than forked: a process forked after numba's threading layer has started in the
+    # parent can deadlock, and spawning keeps the pool safe regardless of what the parent has already run.
+    with ProcessPoolExecutor(max_workers=len(ALGORITHMS), mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = [executor.submit(run_algo, name, algo, ENV_KWARGS, HPARAMS) for name, algo in ALGORITHMS]
+        for future in as_completed(futures):
+            name, q_table, policy, history = future.result()
+            results[name] = q_table, policy, history
+
+    # --- 3. Results ---
+
+    import matplotlib.pyplot as plt
+
+    # Dictionaries to store results for combined plot
+    histories_for_plot = {}
+
+    # All value functions share one 2x2 figure so the algorithms can be compared side by side.
+    fig, axes = plt.subplots(2, 2, figsize=(20, 8))
+
+    for (name, _), ax in zip(ALGORITHMS, axes.flat):
+        q_table, policy, history = results[name]
+        histories_for_plot[name] = history
+
+        # Display the resulting policy visually on the grid.
+        print(f"Final Policy Found by {name}:")
+        cliffwalk_env.print_policy(policy)
+
+        # Convert the learned Q-table to a V-table and visualize the state-value function.
+        v_table = q_to_v_table(q_table)
+        visualize_value_function(cliffwalk_env, v_table, f"State-Value Function (V) for {name}", ax=ax)
+
+    fig.tight_layout()
+    if headless:
+        fig.savefig('value_functions.png', dpi=100)
+
+    # --- 4. Final Comparison Visualization ---
+
+    # Plot the learning curves of all algorithms on the same graph to compare performance.
+    # Its plt.show() call also displays the value function figure, so both windows open together.
+    plot_learning_curves(histories_for_plot, savepath='learning_curves.png' if headless else None)
@@ -15,77 +15,136 @@ Full AGPLv3 text available in LICENSE file or at <https://www.gnu.org/licenses/a
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
 
 
 def q_to_v_table(q_table):
-    """Converts a Q-table to a state-value table (V-table)."""
-    v_table = {}
-    for state, action_values in q_table.items():
-        # The value of a state is the max Q-value among all actions from that state
-        if action_values:
-            v_table[state] = max(action_values.values())
-        else:
-            v_table[state] = 0.0
-    return v_table
+    """Converts a Q-table to a state-value table (V-table).
+    :param q_table: A dict mapping states to their action-values (as arrays or as dicts), or an array whose last axis
+                    holds the actions.
+    :return: A dict mapping states to their values for a dict input, or an array of state values for an array input.
+    """
+    # The value of a state is the max Q-value among all actions from that state, so an array reduces in one call.
+    if isinstance(q_table, np.ndarray):
+        return q_table.max(axis=-1)
+
+    # Rows of a dense Q-table are stacked back into one array and reduced the same way.
+    if q_table and all(isinstance(action_values, np.ndarray) for action_values in q_table.values()):
+        return dict(zip(q_table, np.stack(list(q_table.values())).max(axis=1).tolist()))
+
+    # Read every action-value into one flat buffer, sized from the number of actions recorded per state.
+    states = list(q_table)
+    counts = np.fromiter((len(action_values) for action_values in q_table.values()), dtype=np.intp, count=len(states))
+    flat_values = np.fromiter((value for action_values in q_table.values() for value in action_values.values()),
+                              dtype=np.float64, count=counts.sum())
+
+    if len(states) and counts[0] > 0 and (counts == counts[0]).all():
+        # With the usual fixed set of actions the buffer is already one row per state.
+        v_values = flat_values.reshape(-1, counts[0]).max(axis=1)
+    else:
+        # Otherwise pad the rows to equal length; states without any recorded action keep a value of 0.
+        padded = np.full((len(states), counts.max(initial=0)), -np.inf)
+        padded[np.arange(padded.shape[1]) < counts[:, None]] = flat_values
+        v_values = np.where(counts > 0, padded.max(axis=1, initial=-np.inf), 0.0)
+    return dict(zip(states, v_values.tolist()))
 
 
-def plot_learning_curves(histories_dict, window_size=25):
+def plot_learning_curves(histories_dict, window_size=25, savepath=None):
     """Plots the learning curves (sum of rewards per episode) for multiple TD algorithms.
     :param histories_dict: A dictionary where keys are algorithm names (str) and values are lists of total rewards per episode.
     :param window_size: The size of the moving average window for smoothing the curve.
+    :param savepath: If given, the figure is saved to this path instead of being shown.
     """
-    plt.figure(figsize=(12, 6))
+    # matplotlib is imported on first use so that the non-plotting helpers stay cheap to import.
+    import matplotlib.pyplot as plt
 
+    fig, ax = plt.subplots(figsize=(12, 6))
+
+    curves, labels = [], []
     for name, history in histories_dict.items():
-        # Calculate moving average to smooth the curve and show the trend
+        # Arrays (as returned by the algorithms) are used as they are; lists are converted once.
+        history = np.asarray(history)
+        # Calculate moving average to smooth the curve and show the trend.
+        # Differences of a cumulative sum give every window total in O(N), independent of the window size;
+        # the sum is accumulated in float64 so long float32 histories do not lose precision.
         if len(history) >= window_size:
-            smoothed_rewards = np.convolve(history, np.ones(window_size) / window_size, mode='valid')
-            plt.plot(smoothed_rewards, label=f'{name} (Smoothed)')
+            cumulative = np.concatenate(([0.0], np.cumsum(history, dtype=np.float64)))
+            curves.append((cumulative[window_size:] - cumulative[:-window_size]) / window_size)
+            labels.append(f'{name} (Smoothed)')
         else:
             # Plot raw data if not enough points for smoothing
-            plt.plot(history, label=f'{name} (Raw)')
+            curves.append(history)
+            labels.append(f'{name} (Raw)')
 
-    plt.title('Learning Curve: Rewards per Episode')
-    plt.xlabel('Episodes')
-    plt.ylabel('Sum of Rewards')
-    plt.legend()
-    plt.grid(True)
-    plt.show()
+    # Curves of equal length are drawn as the columns of one stacked array in a single plot call.
+    if curves and all(len(curve) == len(curves[0]) for curve in curves):
+        lines = ax.plot(np.column_stack(curves))
+    else:
+        lines = [ax.plot(curve)[0] for curve in curves]
+
+    ax.set_title('Learning Curve: Rewards per Episode')
+    ax.set_xlabel('Episodes')
+    ax.set_ylabel('Sum of Rewards')
+    ax.legend(lines, labels)
+    ax.grid(True)
+    if savepath is not None:
+        fig.savefig(savepath, dpi=100)
+        plt.close(fig)
+    else:
+        plt.show()
 
 
-def visualize_value_function(env, v, title="State-Value Function (V*)"):
+def visualize_value_function(env, v, title="State-Value Function (V*)", ax=None, savepath=None):
     """Creates a heatmap to visualize the state-value function (V).
     :param env: The maze environment instance.
     :param v: A dictionary mapping states (tuples) to their values.
     :param title: The title for the plot.
+    :param ax: An optional matplotlib Axes to draw into. If None, a new figure is created and shown immediately;
+               otherwise showing the figure is left to the caller.
+    :param savepath: If given, the figure is saved to this path instead of being shown.
     """
-    value_grid = np.full(env.maze.shape, np.nan)
-    for state, value in v.items():
-        value_grid[state] = value
+    import matplotlib.pyplot as plt
+
+    # Collect the values of the visited states once; the colour limits come straight from them.
+    values = np.fromiter(v.values(), dtype=np.float64, count=len(v))
+    rows, cols = np.array(list(v.keys()), dtype=np.intp).reshape(-1, 2).T
+    # Cells without a value stay masked, so imshow leaves them blank.
+    value_grid = np.ma.masked_all(env.maze.shape)
+    value_grid[rows, cols] = values
 
     # Handle cases where not all states were visited
     if not v:
         vmin, vmax = -1, 0
     else:
-        vmin = np.nanmin(value_grid)
-        vmax = np.nanmax(value_grid)
-
-    fig, ax = plt.subplots(figsize=(10, 4))
-    im = ax.imshow(value_grid, cmap='viridis', interpolation='nearest')
-
-    for r in range(env.height):
-        for c in range(env.width):
-            if not np.isnan(value_grid[r, c]):
-                val = value_grid[r, c]
-                text_color = "w" if val < (vmin + vmax) / 2 else "k"
-                ax.text(c, r, f'{val:.1f}', ha='center', va='center', color=text_color)
+        vmin, vmax = values.min(), values.max()
+
+    show = ax is None
+    if show:
+        fig, ax = plt.subplots(figsize=(10, 4))
+    # pcolormesh draws one quad per cell without resampling an image, and is rasterized when saved to vector formats.
+    # Cell (r, c) spans [c, c + 1] x [r, r + 1]; the y-axis is inverted so row 0 sits at the top as with imshow.
+    im = ax.pcolormesh(value_grid, cmap='viridis', rasterized=True)
+    ax.set_aspect('equal')
+    ax.invert_yaxis()
+
+    # Annotate only the cells that hold a value, choosing the text colour against the colormap midpoint.
+    # Walls and cliff tiles are never occupied by the agent, so they are left unlabelled.
+    mid = (vmin + vmax) / 2
+    mask = ~np.ma.getmaskarray(value_grid) & (env.maze != 1) & (env.maze != 4)
+    # Format every label and pick every text colour in one vectorized pass; the loop only reads them back.
+    filled_grid = value_grid.filled(mid)
+    labels = np.char.mod('%.1f', filled_grid)
+    colors = np.where(filled_grid < mid, 'w', 'k')
+    for r, c in np.argwhere(mask):
+        ax.text(c + 0.5, r + 0.5, labels[r, c], ha='center', va='center', color=colors[r, c], rasterized=True)
 
     plt.colorbar(im, ax=ax, label='State Value')
     ax.set_title(title)
-    ax.set_xticks(np.arange(env.width))
-    ax.set_yticks(np.arange(env.height))
+    ax.set_xticks(np.arange(env.width) + 0.5)
+    ax.set_yticks(np.arange(env.height) + 0.5)
     # Set custom labels for cliff walk environment for better readability
     ax.set_xticklabels(np.arange(1, env.width + 1))
     ax.set_yticklabels(np.arange(1, env.height + 1))
-    plt.show()
+    if savepath is not None:
+        ax.figure.savefig(savepath, dpi=100)
+    elif show:
+        plt.show()